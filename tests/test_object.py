@@ -32,9 +32,15 @@ from tests.test_program import MockMemorySegment, mock_program
 
 
 class ObjectTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Each subclass gets its own program, so a test class that modifies it
+        # can't affect the others.
+        cls.prog = mock_program()
+
     def setUp(self):
         super().setUp()
-        self.prog = mock_program()
         # For testing, we want to compare the raw objects rather than using the
         # language's equality operator.
         def object_equality_func(a, b, msg=None):
@@ -1,3 +1,4 @@
+import contextlib
 import ctypes
 import functools
 import itertools
@@ -5,7 +6,6 @@ import os
 import tempfile
 from typing import NamedTuple, Optional
 import unittest
-import unittest.mock
 
 from drgn import (
     Architecture,
@@ -31,69 +31,173 @@ from tests.elf import ET, PT
 from tests.elfwriter import ElfSection, create_elf_file
 
 
+# Module-level fixtures must be immutable (or, like the shared programs and
+# zero buffers below, caches that tests never modify) so that test classes are
+# independent of each other and can run in any order or in parallel, e.g., with
+# pytest-xdist's pytest -n auto. Temporary files are created with tempfile, so
+# their names don't collide between workers.
 MOCK_32BIT_ARCH = Architecture.IS_LITTLE_ENDIAN
 MOCK_ARCH = Architecture.IS_64_BIT | Architecture.IS_LITTLE_ENDIAN
 
 
+def spellings(required, optional=()):
+    # All orderings of the required tokens combined with every subset of the
+    # optional tokens.
+    return tuple(dict.fromkeys(
+        ' '.join(perm)
+        for i in range(len(optional) + 1)
+        for subset in itertools.combinations(optional, i)
+        for perm in itertools.permutations(list(required) + list(subset))
+    ))
+
+
+SIGNED_CHAR_SPELLINGS = spellings(['signed', 'char'])
+UNSIGNED_CHAR_SPELLINGS = spellings(['unsigned', 'char'])
+INT_SPELLINGS = spellings(['int'], ['signed'])
+UNSIGNED_INT_SPELLINGS = spellings(['unsigned', 'int'])
+LONG_DOUBLE_SPELLINGS = spellings(['long', 'double'])
+
+# Every ordering of the longer specifier lists is mostly redundant, so only a
+# representative subset is tested unless DRGN_EXHAUSTIVE_SPELLINGS is set.
+if os.getenv('DRGN_EXHAUSTIVE_SPELLINGS'):
+    SHORT_SPELLINGS = spellings(['short'], ['signed', 'int'])
+    UNSIGNED_SHORT_SPELLINGS = spellings(['short', 'unsigned'], ['int'])
+    LONG_SPELLINGS = spellings(['long'], ['signed', 'int'])
+    UNSIGNED_LONG_SPELLINGS = spellings(['long', 'unsigned'], ['int'])
+    LONG_LONG_SPELLINGS = spellings(['long', 'long'], ['signed', 'int'])
+    UNSIGNED_LONG_LONG_SPELLINGS = spellings(['long', 'long', 'unsigned'],
+                                             ['int'])
+else:
+    SHORT_SPELLINGS = (
+        'short', 'short int', 'int short', 'signed short', 'short signed',
+        'signed short int', 'short signed int', 'int signed short',
+        'short int signed',
+    )
+    UNSIGNED_SHORT_SPELLINGS = (
+        'unsigned short', 'short unsigned', 'unsigned short int',
+        'short unsigned int', 'short int unsigned', 'int short unsigned',
+        'unsigned int short',
+    )
+    LONG_SPELLINGS = (
+        'long', 'long int', 'int long', 'signed long', 'long signed',
+        'signed long int', 'long signed int', 'long int signed',
+        'int long signed', 'signed int long',
+    )
+    UNSIGNED_LONG_SPELLINGS = (
+        'unsigned long', 'long unsigned', 'unsigned long int',
+        'long unsigned int', 'long int unsigned', 'int long unsigned',
+        'unsigned int long',
+    )
+    LONG_LONG_SPELLINGS = (
+        'long long', 'long long int', 'int long long', 'long int long',
+        'signed long long', 'long signed long', 'long long signed',
+        'signed long long int', 'long long signed int', 'long int signed long',
+        'int signed long long', 'long long int signed',
+    )
+    UNSIGNED_LONG_LONG_SPELLINGS = (
+        'unsigned long long', 'long unsigned long', 'long long unsigned',
+        'unsigned long long int', 'long long unsigned int',
+        'long unsigned int long', 'int unsigned long long',
+        'long long int unsigned', 'long int long unsigned',
+    )
+
+
 class MockMemorySegment(NamedTuple):
     buf: bytes
     virt_addr: Optional[int] = None
     phys_addr: Optional[int] = None
 
 
-def mock_memory_read(data, address, count, offset, physical):
-    return data[offset:offset + count]
+def mock_memory_read_fn(data):
+    # The callback may return any buffer, so slicing a memoryview avoids
+    # copying the data. Note that the memoryview keeps the buffer exported for
+    # as long as the program is alive, so resizing a bytearray segment after
+    # creating the program raises BufferError.
+    def mock_memory_read(address, count, offset, physical,
+                         _data=memoryview(data)):
+        return _data[offset:offset + count]
+    return mock_memory_read
+
+
+_zero_bufs = {}
 
 
 def zero_memory_read(address, count, offset, physical):
-    return bytes(count)
+    # bytes are immutable, so buffers of the same size can be shared.
+    try:
+        return _zero_bufs[count]
+    except KeyError:
+        buf = _zero_bufs[count] = bytes(count)
+        return buf
+
+
+class RecordingMemoryReader:
+    """Memory read callback returning zeroes which records its arguments."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, address, count, offset, physical):
+        self.calls.append((address, count, offset, physical))
+        return zero_memory_read(address, count, offset, physical)
+
+    def assert_called_once_with(self, *args):
+        if self.calls != [args]:
+            raise AssertionError(f'expected to be called once with {args!r}; '
+                                 f'calls were {self.calls!r}')
+
+    def assert_not_called(self):
+        if self.calls:
+            raise AssertionError(
+                f'expected not to be called; calls were {self.calls!r}')
 
 
 def mock_program(arch=MOCK_ARCH, *, segments=None, types=None, symbols=None):
-    def mock_find_type(kind, name, filename):
-        if filename:
-            return None
+    type_index = {}
+    if types is not None:
         for type in types:
-            if type.kind == kind:
+            try:
+                type_name = type.name
+            except AttributeError:
                 try:
-                    type_name = type.name
+                    type_name = type.tag
                 except AttributeError:
-                    try:
-                        type_name = type.tag
-                    except AttributeError:
-                        continue
-                if type_name == name:
-                    return type
-        return None
+                    continue
+            type_index.setdefault((type.kind, type_name), type)
 
-    def mock_symbol_find(name, flags, filename):
+    symbol_index = {}
+    if symbols is not None:
+        for sym_name, sym in symbols:
+            symbol_index.setdefault(sym_name, []).append(sym)
+
+    def mock_find_type(kind, name, filename):
         if filename:
             return None
-        for sym_name, sym in symbols:
-            if sym_name == name:
-                if sym.value is not None or sym.is_enumerator:
-                    if flags & FindObjectFlags.CONSTANT:
-                        break
-                elif sym.type.kind == TypeKind.FUNCTION:
-                    if flags & FindObjectFlags.FUNCTION:
-                        break
-                elif flags & FindObjectFlags.VARIABLE:
-                    break
-        else:
+        return type_index.get((kind, name))
+
+    def mock_symbol_find(name, flags, filename):
+        if filename:
             return None
-        return sym
+        for sym in symbol_index.get(name, ()):
+            if sym.value is not None or sym.is_enumerator:
+                if flags & FindObjectFlags.CONSTANT:
+                    return sym
+            elif sym.type.kind == TypeKind.FUNCTION:
+                if flags & FindObjectFlags.FUNCTION:
+                    return sym
+            elif flags & FindObjectFlags.VARIABLE:
+                return sym
+        return None
 
     prog = Program(arch)
     if segments is not None:
         for segment in segments:
-            if segment.virt_addr is not None:
-                prog.add_memory_segment(
-                    segment.virt_addr, len(segment.buf),
-                    functools.partial(mock_memory_read, segment.buf))
-            if segment.phys_addr is not None:
-                prog.add_memory_segment(
-                    segment.phys_addr, len(segment.buf),
-                    functools.partial(mock_memory_read, segment.buf), True)
+            read_fn = mock_memory_read_fn(segment.buf)
+            for address, physical in ((segment.virt_addr, False),
+                                      (segment.phys_addr, True)):
+                if address is not None:
+                    prog.add_memory_segment(address, len(segment.buf),
+                                            read_fn, physical)
     if types is not None:
         prog.add_type_finder(mock_find_type)
     if symbols is not None:
@@ -101,7 +205,25 @@ def mock_program(arch=MOCK_ARCH, *, segments=None, types=None, symbols=None):
     return prog
 
 
+@functools.lru_cache(maxsize=None)
+def _shared_mock_program(arch):
+    return mock_program(arch)
+
+
+# Program with no memory segments or finders shared by tests that don't modify
+# it. Tests that add segments or finders must use mock_program() instead.
+def shared_mock_program(arch=MOCK_ARCH):
+    # Pass arch explicitly so that the default and MOCK_ARCH share an entry.
+    return _shared_mock_program(arch)
+
+
 class TestProgram(unittest.TestCase):
+    def assertRaisesMessage(self, exception, msg, func, *args, **kwds):
+        # Like assertRaisesRegex(), but compares the entire message literally.
+        with self.assertRaises(exception) as cm:
+            func(*args, **kwds)
+        self.assertEqual(str(cm.exception), msg)
+
     def test_set_pid(self):
         # Debug the running Python interpreter itself.
         prog = Program()
@@ -116,37 +238,37 @@ class TestProgram(unittest.TestCase):
                                prog.set_pid, os.getpid())
 
     def test_lookup_error(self):
-        prog = mock_program()
-        self.assertRaisesRegex(LookupError, "^could not find constant 'foo'$",
-                               prog.constant, 'foo')
-        self.assertRaisesRegex(LookupError,
-                               "^could not find constant 'foo' in 'foo.c'$",
-                               prog.constant, 'foo', 'foo.c')
-        self.assertRaisesRegex(LookupError, "^could not find function 'foo'$",
-                               prog.function, 'foo')
-        self.assertRaisesRegex(LookupError,
-                               "^could not find function 'foo' in 'foo.c'$",
-                               prog.function, 'foo', 'foo.c')
-        self.assertRaisesRegex(LookupError, "^could not find 'typedef foo'$",
-                               prog.type, 'foo')
-        self.assertRaisesRegex(LookupError,
-                               "^could not find 'typedef foo' in 'foo.c'$",
-                               prog.type, 'foo', 'foo.c')
-        self.assertRaisesRegex(LookupError, "^could not find variable 'foo'$",
-                               prog.variable, 'foo')
-        self.assertRaisesRegex(LookupError,
-                               "^could not find variable 'foo' in 'foo.c'$",
-                               prog.variable, 'foo', 'foo.c')
+        prog = shared_mock_program()
+        self.assertRaisesMessage(LookupError, "could not find constant 'foo'",
+                                 prog.constant, 'foo')
+        self.assertRaisesMessage(LookupError,
+                                 "could not find constant 'foo' in 'foo.c'",
+                                 prog.constant, 'foo', 'foo.c')
+        self.assertRaisesMessage(LookupError, "could not find function 'foo'",
+                                 prog.function, 'foo')
+        self.assertRaisesMessage(LookupError,
+                                 "could not find function 'foo' in 'foo.c'",
+                                 prog.function, 'foo', 'foo.c')
+        self.assertRaisesMessage(LookupError, "could not find 'typedef foo'",
+                                 prog.type, 'foo')
+        self.assertRaisesMessage(LookupError,
+                                 "could not find 'typedef foo' in 'foo.c'",
+                                 prog.type, 'foo', 'foo.c')
+        self.assertRaisesMessage(LookupError, "could not find variable 'foo'",
+                                 prog.variable, 'foo')
+        self.assertRaisesMessage(LookupError,
+                                 "could not find variable 'foo' in 'foo.c'",
+                                 prog.variable, 'foo', 'foo.c')
         # prog[key] should raise KeyError instead of LookupError.
         self.assertRaises(KeyError, prog.__getitem__, 'foo')
         # Even for non-strings.
         self.assertRaises(KeyError, prog.__getitem__, 9)
 
     def test_flags(self):
-        self.assertIsInstance(mock_program().flags, ProgramFlags)
+        self.assertIsInstance(shared_mock_program().flags, ProgramFlags)
 
     def test_pointer_type(self):
-        prog = mock_program()
+        prog = shared_mock_program()
         self.assertEqual(prog.pointer_type(prog.type('int')),
                          prog.type('int *'))
         self.assertEqual(prog.pointer_type('int'),
@@ -194,8 +316,8 @@ class TestMemory(unittest.TestCase):
         # Existing segment: |_______|
         # New segment:      |___|
         prog = Program()
-        segment1 = unittest.mock.Mock(side_effect=zero_memory_read)
-        segment2 = unittest.mock.Mock(side_effect=zero_memory_read)
+        segment1 = RecordingMemoryReader()
+        segment2 = RecordingMemoryReader()
         prog.add_memory_segment(0xffff0000, 128, segment1)
         prog.add_memory_segment(0xffff0000, 64, segment2)
         prog.read(0xffff0000, 128)
@@ -206,14 +328,14 @@ class TestMemory(unittest.TestCase):
         # Existing segment: |_______|
         # New segment:        |___|
         prog = Program()
-        segment1 = unittest.mock.Mock(side_effect=zero_memory_read)
-        segment2 = unittest.mock.Mock(side_effect=zero_memory_read)
+        segment1 = RecordingMemoryReader()
+        segment2 = RecordingMemoryReader()
         prog.add_memory_segment(0xffff0000, 128, segment1)
         prog.add_memory_segment(0xffff0020, 64, segment2)
         prog.read(0xffff0000, 128)
-        segment1.assert_has_calls([
-            unittest.mock.call(0xffff0000, 32, 00, False),
-            unittest.mock.call(0xffff0060, 32, 96, False),
+        self.assertEqual(segment1.calls, [
+            (0xffff0000, 32, 0, False),
+            (0xffff0060, 32, 96, False),
         ])
         segment2.assert_called_once_with(0xffff0020, 64, 0, False)
 
@@ -221,8 +343,8 @@ class TestMemory(unittest.TestCase):
         # Existing segment: |_______|
         # New segment:      |_______|
         prog = Program()
-        segment1 = unittest.mock.Mock(side_effect=zero_memory_read)
-        segment2 = unittest.mock.Mock(side_effect=zero_memory_read)
+        segment1 = RecordingMemoryReader()
+        segment2 = RecordingMemoryReader()
         prog.add_memory_segment(0xffff0000, 128, segment1)
         prog.add_memory_segment(0xffff0000, 128, segment2)
         prog.read(0xffff0000, 128)
@@ -233,8 +355,8 @@ class TestMemory(unittest.TestCase):
         # Existing segment: |___|
         # New segment:      |_______|
         prog = Program()
-        segment1 = unittest.mock.Mock(side_effect=zero_memory_read)
-        segment2 = unittest.mock.Mock(side_effect=zero_memory_read)
+        segment1 = RecordingMemoryReader()
+        segment2 = RecordingMemoryReader()
         prog.add_memory_segment(0xffff0000, 64, segment1)
         prog.add_memory_segment(0xffff0000, 128, segment2)
         prog.read(0xffff0000, 128)
@@ -245,8 +367,8 @@ class TestMemory(unittest.TestCase):
         # Existing segment: |_______|
         # New segment:          |_______|
         prog = Program()
-        segment1 = unittest.mock.Mock(side_effect=zero_memory_read)
-        segment2 = unittest.mock.Mock(side_effect=zero_memory_read)
+        segment1 = RecordingMemoryReader()
+        segment2 = RecordingMemoryReader()
         prog.add_memory_segment(0xffff0000, 128, segment1)
         prog.add_memory_segment(0xffff0040, 128, segment2)
         prog.read(0xffff0000, 192)
@@ -257,9 +379,9 @@ class TestMemory(unittest.TestCase):
         # Existing segments:   |_|_|_|_|
         # New segment:       |_______|
         prog = Program()
-        segment1 = unittest.mock.Mock(side_effect=zero_memory_read)
-        segment2 = unittest.mock.Mock(side_effect=zero_memory_read)
-        segment3 = unittest.mock.Mock(side_effect=zero_memory_read)
+        segment1 = RecordingMemoryReader()
+        segment2 = RecordingMemoryReader()
+        segment3 = RecordingMemoryReader()
         prog.add_memory_segment(0xffff0020, 32, segment1)
         prog.add_memory_segment(0xffff0040, 32, segment1)
         prog.add_memory_segment(0xffff0060, 32, segment1)
@@ -274,8 +396,8 @@ class TestMemory(unittest.TestCase):
         # Existing segment:     |_______|
         # New segment:      |_______|
         prog = Program()
-        segment1 = unittest.mock.Mock(side_effect=zero_memory_read)
-        segment2 = unittest.mock.Mock(side_effect=zero_memory_read)
+        segment1 = RecordingMemoryReader()
+        segment2 = RecordingMemoryReader()
         prog.add_memory_segment(0xffff0040, 128, segment1)
         prog.add_memory_segment(0xffff0000, 128, segment2)
         prog.read(0xffff0000, 192)
@@ -286,9 +408,9 @@ class TestMemory(unittest.TestCase):
         # Existing segment: |_______||_______|
         # New segment:          |_______|
         prog = Program()
-        segment1 = unittest.mock.Mock(side_effect=zero_memory_read)
-        segment2 = unittest.mock.Mock(side_effect=zero_memory_read)
-        segment3 = unittest.mock.Mock(side_effect=zero_memory_read)
+        segment1 = RecordingMemoryReader()
+        segment2 = RecordingMemoryReader()
+        segment3 = RecordingMemoryReader()
         prog.add_memory_segment(0xffff0000, 128, segment1)
         prog.add_memory_segment(0xffff0080, 128, segment2)
         prog.add_memory_segment(0xffff0040, 128, segment3)
@@ -301,8 +423,8 @@ class TestMemory(unittest.TestCase):
         # Existing segments: |_|_|_|_|
         # New segment:       |_______|
         prog = Program()
-        segment1 = unittest.mock.Mock(side_effect=zero_memory_read)
-        segment2 = unittest.mock.Mock(side_effect=zero_memory_read)
+        segment1 = RecordingMemoryReader()
+        segment2 = RecordingMemoryReader()
         prog.add_memory_segment(0xffff0000, 32, segment1)
         prog.add_memory_segment(0xffff0020, 32, segment1)
         prog.add_memory_segment(0xffff0040, 32, segment1)
@@ -338,6 +460,13 @@ class TestMemory(unittest.TestCase):
 
 
 class TestTypes(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.prog = shared_mock_program()
+        cls.INT = int_type('int', 4, True)
+        cls.PINT = pointer_type(8, cls.INT)
+        cls.PPINT = pointer_type(8, cls.PINT)
+
     def test_invalid_finder(self):
         self.assertRaises(TypeError, mock_program().add_type_finder, 'foo')
 
@@ -357,50 +486,46 @@ class TestTypes(unittest.TestCase):
         self.assertRaises(LookupError, prog.type, 'struct foo')
 
     def test_default_primitive_types(self):
-        def spellings(tokens, num_optional=0):
-            for i in range(len(tokens) - num_optional, len(tokens) + 1):
-                for perm in itertools.permutations(tokens[:i]):
-                    yield ' '.join(perm)
-
         for word_size in [8, 4]:
-            prog = mock_program(MOCK_ARCH if word_size == 8 else MOCK_32BIT_ARCH)
+            prog = shared_mock_program(MOCK_ARCH if word_size == 8
+                                       else MOCK_32BIT_ARCH)
             self.assertEqual(prog.type('_Bool'), bool_type('_Bool', 1))
             self.assertEqual(prog.type('char'), int_type('char', 1, True))
-            for spelling in spellings(['signed', 'char']):
+            for spelling in SIGNED_CHAR_SPELLINGS:
                 self.assertEqual(prog.type(spelling),
                                  int_type('signed char', 1, True))
-            for spelling in spellings(['unsigned', 'char']):
+            for spelling in UNSIGNED_CHAR_SPELLINGS:
                 self.assertEqual(prog.type(spelling),
                                  int_type('unsigned char', 1, False))
-            for spelling in spellings(['short', 'signed', 'int'], 2):
+            for spelling in SHORT_SPELLINGS:
                 self.assertEqual(prog.type(spelling),
                                  int_type('short', 2, True))
-            for spelling in spellings(['short', 'unsigned', 'int'], 1):
+            for spelling in UNSIGNED_SHORT_SPELLINGS:
                 self.assertEqual(prog.type(spelling),
                                  int_type('unsigned short', 2, False))
-            for spelling in spellings(['int', 'signed'], 1):
+            for spelling in INT_SPELLINGS:
                 self.assertEqual(prog.type(spelling),
                                  int_type('int', 4, True))
-            for spelling in spellings(['unsigned', 'int']):
+            for spelling in UNSIGNED_INT_SPELLINGS:
                 self.assertEqual(prog.type(spelling),
                                  int_type('unsigned int', 4, False))
-            for spelling in spellings(['long', 'signed', 'int'], 2):
+            for spelling in LONG_SPELLINGS:
                 self.assertEqual(prog.type(spelling),
                                  int_type('long', word_size, True))
-            for spelling in spellings(['long', 'unsigned', 'int'], 1):
+            for spelling in UNSIGNED_LONG_SPELLINGS:
                 self.assertEqual(prog.type(spelling),
                                  int_type('unsigned long', word_size, False))
-            for spelling in spellings(['long', 'long', 'signed', 'int'], 2):
+            for spelling in LONG_LONG_SPELLINGS:
                 self.assertEqual(prog.type(spelling),
                                  int_type('long long', 8, True))
-            for spelling in spellings(['long', 'long', 'unsigned', 'int'], 1):
+            for spelling in UNSIGNED_LONG_LONG_SPELLINGS:
                 self.assertEqual(prog.type(spelling),
                                  int_type('unsigned long long', 8, False))
             self.assertEqual(prog.type('float'),
                              float_type('float', 4))
             self.assertEqual(prog.type('double'),
                              float_type('double', 8))
-            for spelling in spellings(['long', 'double']):
+            for spelling in LONG_DOUBLE_SPELLINGS:
                 self.assertEqual(prog.type(spelling),
                                  float_type('long double', 16))
             self.assertEqual(prog.type('size_t'),
@@ -469,66 +594,59 @@ class TestTypes(unittest.TestCase):
         self.assertEqual(prog.type('pid_t'), pid_type)
 
     def test_pointer(self):
-        prog = mock_program()
-        self.assertEqual(prog.type('int *'),
-                         pointer_type(8, int_type('int', 4, True)))
-        self.assertEqual(prog.type('const int *'),
+        self.assertEqual(self.prog.type('int *'), self.PINT)
+        self.assertEqual(self.prog.type('const int *'),
                          pointer_type(8, int_type('int', 4, True, Qualifiers.CONST)))
-        self.assertEqual(prog.type('int * const'),
-                         pointer_type(8, int_type('int', 4, True), Qualifiers.CONST))
-        self.assertEqual(prog.type('int **'),
-                         pointer_type(8, pointer_type(8, int_type('int', 4, True))))
-        self.assertEqual(prog.type('int *((*))'),
-                         pointer_type(8, pointer_type(8, int_type('int', 4, True))))
-        self.assertEqual(prog.type('int * const *'),
-                         pointer_type(8, pointer_type(8, int_type('int', 4, True), Qualifiers.CONST)))
+        self.assertEqual(self.prog.type('int * const'),
+                         pointer_type(8, self.INT, Qualifiers.CONST))
+        self.assertEqual(self.prog.type('int **'), self.PPINT)
+        self.assertEqual(self.prog.type('int *((*))'), self.PPINT)
+        self.assertEqual(self.prog.type('int * const *'),
+                         pointer_type(8, pointer_type(8, self.INT, Qualifiers.CONST)))
 
     def test_array(self):
-        prog = mock_program()
-        self.assertEqual(prog.type('int []'),
-                         array_type(None, int_type('int', 4, True)))
-        self.assertEqual(prog.type('int [20]'),
-                         array_type(20, int_type('int', 4, True)))
-        self.assertEqual(prog.type('int [0x20]'),
-                         array_type(32, int_type('int', 4, True)))
-        self.assertEqual(prog.type('int [020]'),
-                         array_type(16, int_type('int', 4, True)))
-        self.assertEqual(prog.type('int [2][3]'),
-                         array_type(2, array_type(3, int_type('int', 4, True))))
-        self.assertEqual(prog.type('int [2][3][4]'),
-                         array_type(2, array_type(3, array_type(4, int_type('int', 4, True)))))
+        self.assertEqual(self.prog.type('int []'), array_type(None, self.INT))
+        self.assertEqual(self.prog.type('int [20]'), array_type(20, self.INT))
+        self.assertEqual(self.prog.type('int [0x20]'), array_type(32, self.INT))
+        self.assertEqual(self.prog.type('int [020]'), array_type(16, self.INT))
+        self.assertEqual(self.prog.type('int [2][3]'),
+                         array_type(2, array_type(3, self.INT)))
+        self.assertEqual(self.prog.type('int [2][3][4]'),
+                         array_type(2, array_type(3, array_type(4, self.INT))))
 
     def test_array_of_pointers(self):
-        prog = mock_program()
-        self.assertEqual(prog.type('int *[2][3]'),
-                         array_type(2, array_type(3, pointer_type(8, int_type('int', 4, True)))))
+        self.assertEqual(self.prog.type('int *[2][3]'),
+                         array_type(2, array_type(3, self.PINT)))
 
     def test_pointer_to_array(self):
-        prog = mock_program()
-        self.assertEqual(prog.type('int (*)[2]'),
-                         pointer_type(8, array_type(2, int_type('int', 4, True))))
-        self.assertEqual(prog.type('int (*)[2][3]'),
-                         pointer_type(8, array_type(2, array_type(3, int_type('int', 4, True)))))
+        self.assertEqual(self.prog.type('int (*)[2]'),
+                         pointer_type(8, array_type(2, self.INT)))
+        self.assertEqual(self.prog.type('int (*)[2][3]'),
+                         pointer_type(8, array_type(2, array_type(3, self.INT))))
 
     def test_pointer_to_pointer_to_array(self):
-        prog = mock_program()
-        self.assertEqual(prog.type('int (**)[2]'),
-                         pointer_type(8, pointer_type(8, array_type(2, int_type('int', 4, True)))))
+        self.assertEqual(self.prog.type('int (**)[2]'),
+                         pointer_type(8, pointer_type(8, array_type(2, self.INT))))
 
     def test_pointer_to_array_of_pointers(self):
-        prog = mock_program()
-        self.assertEqual(prog.type('int *(*)[2]'),
-                         pointer_type(8, array_type(2, pointer_type(8, int_type('int', 4, True)))))
-        self.assertEqual(prog.type('int *((*)[2])'),
-                         pointer_type(8, array_type(2, pointer_type(8, int_type('int', 4, True)))))
+        self.assertEqual(self.prog.type('int *(*)[2]'),
+                         pointer_type(8, array_type(2, self.PINT)))
+        self.assertEqual(self.prog.type('int *((*)[2])'),
+                         pointer_type(8, array_type(2, self.PINT)))
 
     def test_array_of_pointers_to_array(self):
-        prog = mock_program()
-        self.assertEqual(prog.type('int (*[2])[3]'),
-                         array_type(2, pointer_type(8, array_type(3, int_type('int', 4, True)))))
+        self.assertEqual(self.prog.type('int (*[2])[3]'),
+                         array_type(2, pointer_type(8, array_type(3, self.INT))))
 
 
 class TestSymbols(unittest.TestCase):
+    CONSTANT_SYM = Symbol(int_type('int', 4, True), value=4096)
+    FUNCTION_SYM = Symbol(function_type(void_type(), (), False),
+                          address=0xffff0000, byteorder='little')
+    VARIABLE_SYM = Symbol(int_type('int', 4, True), address=0xffff0000,
+                          byteorder='little')
+    ENUMERATOR_SYM = Symbol(color_type, is_enumerator=True)
+
     def test_invalid_finder(self):
         self.assertRaises(TypeError, mock_program().add_symbol_finder, 'foo')
 
@@ -544,7 +662,7 @@ class TestSymbols(unittest.TestCase):
         self.assertFalse('foo' in prog)
 
     def test_constant(self):
-        sym = Symbol(int_type('int', 4, True), value=4096)
+        sym = self.CONSTANT_SYM
         prog = mock_program(symbols=[('PAGE_SIZE', sym)])
         self.assertEqual(prog._symbol('PAGE_SIZE', FindObjectFlags.CONSTANT),
                          sym)
@@ -552,16 +670,14 @@ class TestSymbols(unittest.TestCase):
         self.assertTrue('PAGE_SIZE' in prog)
 
     def test_function(self):
-        sym = Symbol(function_type(void_type(), (), False), address=0xffff0000,
-                     byteorder='little')
+        sym = self.FUNCTION_SYM
         prog = mock_program(symbols=[('func', sym)])
         self.assertEqual(prog._symbol('func', FindObjectFlags.FUNCTION), sym)
         self.assertEqual(prog._symbol('func', FindObjectFlags.ANY), sym)
         self.assertTrue('func' in prog)
 
     def test_variable(self):
-        sym = Symbol(int_type('int', 4, True), address=0xffff0000,
-                     byteorder='little')
+        sym = self.VARIABLE_SYM
         prog = mock_program(symbols=[('counter', sym)])
         self.assertEqual(prog._symbol('counter', FindObjectFlags.VARIABLE), sym)
         self.assertEqual(prog._symbol('counter', FindObjectFlags.ANY), sym)
@@ -570,12 +686,59 @@ class TestSymbols(unittest.TestCase):
     def test_wrong_kind(self):
         prog = mock_program()
         prog.add_symbol_finder(lambda name, flags, filename:
-                               Symbol(color_type, is_enumerator=True))
+                               self.ENUMERATOR_SYM)
         self.assertRaisesRegex(TypeError, 'wrong kind', prog._symbol, 'foo',
                                FindObjectFlags.VARIABLE | FindObjectFlags.FUNCTION)
 
 
 class TestCoreDump(unittest.TestCase):
+    DATA = b'hello, world'
+
+    @classmethod
+    def setUpClass(cls):
+        elf_files = {
+            'exec_empty': create_elf_file(ET.EXEC, []),
+            'core_empty': create_elf_file(ET.CORE, []),
+            'core_simple': create_elf_file(ET.CORE, [
+                ElfSection(
+                    p_type=PT.LOAD,
+                    vaddr=0xffff0000,
+                    data=cls.DATA,
+                ),
+            ]),
+            'core_physical': create_elf_file(ET.CORE, [
+                ElfSection(
+                    p_type=PT.LOAD,
+                    vaddr=0xffff0000,
+                    paddr=0xa0,
+                    data=cls.DATA,
+                ),
+            ]),
+            'core_zero_fill': create_elf_file(ET.CORE, [
+                ElfSection(
+                    p_type=PT.LOAD,
+                    vaddr=0xffff0000,
+                    data=cls.DATA,
+                    memsz=len(cls.DATA) + 4,
+                ),
+            ]),
+        }
+        cls._elf_files = {}
+        try:
+            for name, contents in elf_files.items():
+                with tempfile.NamedTemporaryFile(delete=False) as f:
+                    cls._elf_files[name] = f.name
+                    f.write(contents)
+        except BaseException:
+            cls.tearDownClass()
+            raise
+
+    @classmethod
+    def tearDownClass(cls):
+        for path in cls._elf_files.values():
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+
     def test_not_elf(self):
         prog = Program()
         self.assertRaisesRegex(FileFormatError, 'not an ELF file',
@@ -583,67 +746,34 @@ class TestCoreDump(unittest.TestCase):
 
     def test_not_core_dump(self):
         prog = Program()
-        with tempfile.NamedTemporaryFile() as f:
-            f.write(create_elf_file(ET.EXEC, []))
-            f.flush()
-            self.assertRaisesRegex(ValueError, 'not an ELF core file',
-                                   prog.set_core_dump, f.name)
+        self.assertRaisesRegex(ValueError, 'not an ELF core file',
+                               prog.set_core_dump,
+                               self._elf_files['exec_empty'])
 
     def test_twice(self):
         prog = Program()
-        with tempfile.NamedTemporaryFile() as f:
-            f.write(create_elf_file(ET.CORE, []))
-            f.flush()
-            prog.set_core_dump(f.name)
-            self.assertRaisesRegex(ValueError,
-                                   'program memory was already initialized',
-                                   prog.set_core_dump, f.name)
+        prog.set_core_dump(self._elf_files['core_empty'])
+        self.assertRaisesRegex(ValueError,
+                               'program memory was already initialized',
+                               prog.set_core_dump,
+                               self._elf_files['core_empty'])
 
     def test_simple(self):
-        data = b'hello, world'
         prog = Program()
-        with tempfile.NamedTemporaryFile() as f:
-            f.write(create_elf_file(ET.CORE, [
-                ElfSection(
-                    p_type=PT.LOAD,
-                    vaddr=0xffff0000,
-                    data=data,
-                ),
-            ]))
-            f.flush()
-            prog.set_core_dump(f.name)
-        self.assertEqual(prog.read(0xffff0000, len(data)), data)
-        self.assertRaises(FaultError, prog.read, 0x0, len(data), physical=True)
+        prog.set_core_dump(self._elf_files['core_simple'])
+        self.assertEqual(prog.read(0xffff0000, len(self.DATA)), self.DATA)
+        self.assertRaises(FaultError, prog.read, 0x0, len(self.DATA),
+                          physical=True)
 
     def test_physical(self):
-        data = b'hello, world'
         prog = Program()
-        with tempfile.NamedTemporaryFile() as f:
-            f.write(create_elf_file(ET.CORE, [
-                ElfSection(
-                    p_type=PT.LOAD,
-                    vaddr=0xffff0000,
-                    paddr=0xa0,
-                    data=data,
-                ),
-            ]))
-            f.flush()
-            prog.set_core_dump(f.name)
-        self.assertEqual(prog.read(0xffff0000, len(data)), data)
-        self.assertEqual(prog.read(0xa0, len(data), physical=True), data)
+        prog.set_core_dump(self._elf_files['core_physical'])
+        self.assertEqual(prog.read(0xffff0000, len(self.DATA)), self.DATA)
+        self.assertEqual(prog.read(0xa0, len(self.DATA), physical=True),
+                         self.DATA)
 
     def test_zero_fill(self):
-        data = b'hello, world'
         prog = Program()
-        with tempfile.NamedTemporaryFile() as f:
-            f.write(create_elf_file(ET.CORE, [
-                ElfSection(
-                    p_type=PT.LOAD,
-                    vaddr=0xffff0000,
-                    data=data,
-                    memsz=len(data) + 4,
-                ),
-            ]))
-            f.flush()
-            prog.set_core_dump(f.name)
-        self.assertEqual(prog.read(0xffff0000, len(data) + 4), data + bytes(4))
+        prog.set_core_dump(self._elf_files['core_zero_fill'])
+        self.assertEqual(prog.read(0xffff0000, len(self.DATA) + 4),
+                         self.DATA + bytes(4))